@@ -5,10 +5,11 @@ This script provides a client for the NetTool BLE HTTP Proxy service.
 It can be used to test the BLE connection and send HTTP requests.
 """
 
-import argparse
-import binascii
+import json
 import logging
+import os
 import sys
+import threading
 import time
 import uuid
 
@@ -18,11 +19,6 @@ except ImportError:
     print("Error: bluepy module not found. Install with 'pip install bluepy'")
     sys.exit(1)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('nettool-ble-client')
 
 # BLE Service UUIDs
@@ -31,80 +27,167 @@ BLE_REQUEST_CHAR_UUID = "00001235-0000-1000-8000-00805f9b34fb"
 BLE_RESPONSE_CHAR_UUID = "00001236-0000-1000-8000-00805f9b34fb"
 BLE_STATUS_CHAR_UUID = "00001237-0000-1000-8000-00805f9b34fb"
 
+# ATT MTU to request on connect; the default MTU is used if negotiation fails
+REQUESTED_MTU = 247
+DEFAULT_ATT_MTU = 23
+
+# Per-chunk overhead: 3 bytes of ATT header, 16 bytes for request ID, 1 byte for flags
+ATT_HEADER_SIZE = 3
+CHUNK_HEADER_SIZE = 17
+
+# Devices seen by --scan, so later connects know the address type
+KNOWN_DEVICES_FILE = os.path.join(
+    os.environ.get('XDG_STATE_HOME', os.path.expanduser('~/.local/state')),
+    'nettool-ble', 'known.json')
+
+# Keep an idle connection around this long before reconnecting
+DEFAULT_IDLE_TTL = 30
+
 class NotificationDelegate(btle.DefaultDelegate):
     def __init__(self):
         btle.DefaultDelegate.__init__(self)
-        self.response_data = bytearray()
-        self.response_complete = False
+        self.response_data = b''
+        self.response_complete = threading.Event()
         self.current_uuid = None
+        self._chunks = []
+    
+    def expect_response(self, id_header):
+        """Reset state before waiting for the response to a new request"""
+        self.response_data = b''
+        self.response_complete.clear()
+        self.current_uuid = id_header
+        self._chunks = []
     
     def handleNotification(self, cHandle, data):
         if len(data) < 17:  # Minimum length: UUID (16) + flags (1)
             logger.error("Received notification with invalid length")
             return
         
-        # Extract UUID and flags
+        # Extract UUID and flags; the UUID stays as raw padded bytes
         uuid_bytes = data[:16]
         flags = data[16]
         chunk_data = data[17:]
         
-        # Clean up UUID (remove trailing nulls)
-        uuid_str = uuid_bytes.decode('utf-8').rstrip('\0')
-        
         is_first = (flags & 1) != 0
         is_last = (flags & 2) != 0
         
-        logger.debug(f"Received chunk: UUID={uuid_str}, first={is_first}, last={is_last}, len={len(chunk_data)}")
+        # Per-chunk logs use lazy formatting so nothing is built at INFO level
+        logger.debug("Received chunk: UUID=%s, first=%s, last=%s, len=%d",
+                     uuid_bytes, is_first, is_last, len(chunk_data))
         
         if is_first:
             # New response
-            self.response_data = bytearray(chunk_data)
-            self.current_uuid = uuid_str
-        elif uuid_str == self.current_uuid:
+            self._chunks = [chunk_data]
+            self.current_uuid = uuid_bytes
+        elif uuid_bytes == self.current_uuid:
             # Continuation of previous response
-            self.response_data.extend(chunk_data)
+            self._chunks.append(chunk_data)
         else:
-            logger.error(f"Received chunk for unexpected UUID: {uuid_str}")
+            logger.error(f"Received chunk for unexpected UUID: {uuid_bytes}")
             return
         
         if is_last:
-            self.response_complete = True
+            # Join the chunks once instead of growing a buffer per notification
+            self.response_data = b''.join(self._chunks)
+            self._chunks = []
+            self.response_complete.set()
             logger.info(f"Response complete: {len(self.response_data)} bytes")
 
+class ScanDelegate(btle.DefaultDelegate):
+    """Keeps only devices that advertise the HTTP proxy service"""
+    # Incomplete/complete lists of 16-bit and 128-bit service UUIDs
+    SERVICE_AD_TYPES = (0x02, 0x03, 0x06, 0x07)
+    
+    def __init__(self):
+        btle.DefaultDelegate.__init__(self)
+        self.devices = {}
+    
+    def handleDiscovery(self, dev, isNewDev, isNewData):
+        if dev.addr in self.devices or not (isNewDev or isNewData):
+            return
+        
+        for adtype in self.SERVICE_AD_TYPES:
+            uuids = dev.getValue(adtype)
+            if uuids and BLE_SERVICE_UUID in uuids:
+                self.devices[dev.addr] = dev
+                return
+
 def scan_for_devices(timeout=10):
-    """Scan for BLE devices"""
+    """Scan for BLE devices advertising the HTTP proxy service"""
     logger.info(f"Scanning for BLE devices for {timeout} seconds...")
-    scanner = btle.Scanner()
-    devices = scanner.scan(timeout)
+    delegate = ScanDelegate()
+    scanner = btle.Scanner().withDelegate(delegate)
+    scanner.scan(timeout)
+    devices = list(delegate.devices.values())
     
-    logger.info(f"Found {len(devices)} devices")
+    logger.info(f"Found {len(devices)} NetTool devices")
     for dev in devices:
         logger.info(f"Device {dev.addr} ({dev.addrType}), RSSI={dev.rssi} dB")
         for (adtype, desc, value) in dev.getScanData():
-            if desc == "Complete Local Name" and "NetTool" in value:
-                logger.info(f"  {desc}: {value} ** NETTOOL DEVICE **")
-            else:
-                logger.info(f"  {desc}: {value}")
+            logger.info(f"  {desc}: {value}")
     
+    save_known_devices(devices)
     return devices
 
-def connect_to_device(address):
-    """Connect to a specific device by MAC address"""
+def load_known_devices():
+    """Load the devices recorded by previous scans"""
+    try:
+        with open(KNOWN_DEVICES_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_known_devices(devices):
+    """Record scanned devices so a later connect can skip address type resolution"""
+    known = load_known_devices()
+    for dev in devices:
+        known[dev.addr] = {
+            'name': dev.getValueText(btle.ScanEntry.COMPLETE_LOCAL_NAME),
+            'addr_type': dev.addrType,
+            'last_seen': int(time.time()),
+        }
+    
+    try:
+        os.makedirs(os.path.dirname(KNOWN_DEVICES_FILE), exist_ok=True)
+        with open(KNOWN_DEVICES_FILE, 'w') as f:
+            json.dump(known, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not save known devices: {e}")
+
+def negotiate_mtu(peripheral, mtu=REQUESTED_MTU):
+    """Request a larger ATT MTU and return the value in effect"""
     try:
-        logger.info(f"Connecting to {address}...")
-        peripheral = btle.Peripheral(address)
+        resp = peripheral.setMTU(mtu)
+        negotiated = int(resp.get('mtu', [mtu])[0]) if resp else mtu
+    except btle.BTLEException as e:
+        logger.warning(f"MTU negotiation failed, using default: {e}")
+        negotiated = DEFAULT_ATT_MTU
+    
+    logger.info(f"Using ATT MTU of {negotiated} bytes")
+    return negotiated
+
+def connect_to_device(address, addr_type=None):
+    """Connect to a specific device by MAC address, without scanning first"""
+    if addr_type is None:
+        addr_type = load_known_devices().get(address.lower(), {}).get('addr_type', btle.ADDR_TYPE_PUBLIC)
+    
+    try:
+        logger.info(f"Connecting to {address} ({addr_type})...")
+        peripheral = btle.Peripheral(address, addrType=addr_type)
         peripheral.setDelegate(NotificationDelegate())
+        peripheral.mtu = negotiate_mtu(peripheral)
         
         # Get service
         service = peripheral.getServiceByUUID(BLE_SERVICE_UUID)
         
-        # Get characteristics
-        request_char = service.getCharacteristic(BLE_REQUEST_CHAR_UUID)
-        response_char = service.getCharacteristic(BLE_RESPONSE_CHAR_UUID)
-        status_char = service.getCharacteristic(BLE_STATUS_CHAR_UUID)
+        # Get characteristics once and keep the handles on the peripheral,
+        # so later requests don't repeat GATT discovery over the air
+        peripheral.request_char = service.getCharacteristic(BLE_REQUEST_CHAR_UUID)
+        peripheral.response_char = service.getCharacteristic(BLE_RESPONSE_CHAR_UUID)
+        peripheral.status_char = service.getCharacteristic(BLE_STATUS_CHAR_UUID)
         
         # Enable notifications for response characteristic
-        response_desc = response_char.getDescriptors(forUUID=0x2902)[0]
+        response_desc = peripheral.response_char.getDescriptors(forUUID=0x2902)[0]
         response_desc.write(b"\x01\x00", True)
         
         return peripheral
@@ -115,13 +198,9 @@ def connect_to_device(address):
 def get_status(peripheral):
     """Get status information from the BLE HTTP Proxy"""
     try:
-        service = peripheral.getServiceByUUID(BLE_SERVICE_UUID)
-        status_char = service.getCharacteristic(BLE_STATUS_CHAR_UUID)
-        
-        status_bytes = status_char.read()
+        status_bytes = peripheral.status_char.read()
         status_str = bytes(status_bytes).decode('utf-8')
         
-        import json
         status_json = json.loads(status_str)
         
         logger.info(f"Status: {status_json}")
@@ -133,47 +212,57 @@ def get_status(peripheral):
 def send_http_request(peripheral, method, path, headers=None, body=None):
     """Send an HTTP request over BLE"""
     try:
-        service = peripheral.getServiceByUUID(BLE_SERVICE_UUID)
-        request_char = service.getCharacteristic(BLE_REQUEST_CHAR_UUID)
-        response_char = service.getCharacteristic(BLE_RESPONSE_CHAR_UUID)
+        request_char = peripheral.request_char
         
         # Build HTTP request
-        request = f"{method} {path} HTTP/1.1\r\n"
-        
-        # Add headers
-        if headers is None:
-            headers = {}
-        
-        for key, value in headers.items():
-            request += f"{key}: {value}\r\n"
-        
-        # Add content length if body is provided
-        if body:
-            request += f"Content-Length: {len(body)}\r\n"
-        
-        # End headers
-        request += "\r\n"
-        
-        # Add body if provided
-        if body:
-            request += body
+        if method == 'GET' and not headers and not body:
+            # Fast path for the common bodiless GET
+            request_bytes = f"GET {path} HTTP/1.1\r\n\r\n".encode('utf-8')
+        else:
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            
+            parts = [f"{method} {path} HTTP/1.1\r\n"]
+            parts.extend(f"{key}: {value}\r\n" for key, value in (headers or {}).items())
+            
+            # Add content length if body is provided
+            if body:
+                parts.append(f"Content-Length: {len(body)}\r\n")
+            
+            # End headers
+            parts.append("\r\n")
+            
+            request_bytes = ''.join(parts).encode('utf-8')
+            
+            # Add body if provided
+            if body:
+                request_bytes += body
         
         logger.info(f"Sending HTTP request: {method} {path}")
         
         # Generate a random request ID
         request_id = str(uuid.uuid4())[:16]
-        request_bytes = request.encode('utf-8')
         
-        # Maximum data size per write
-        max_chunk_size = 512 - 17  # 16 bytes for UUID, 1 byte for flags
+        # Maximum data size per write, so each chunk fits in one ATT PDU
+        max_chunk_size = peripheral.mtu - ATT_HEADER_SIZE - CHUNK_HEADER_SIZE
         
         # Calculate number of chunks
         total_chunks = (len(request_bytes) + max_chunk_size - 1) // max_chunk_size
         
+        # Pipeline all but the last chunk as Write Without Response when the
+        # server supports it; the acknowledged final write flushes the queue
+        can_write_no_resp = (request_char.properties &
+                             btle.Characteristic.props["WRITE_NO_RESP"]) != 0
+        
+        # The request ID header is the same for every chunk, padded to 16 bytes
+        id_header = request_id.encode('utf-8')[:16].ljust(16, b'\0')
+        
         delegate = peripheral.delegate
-        delegate.response_complete = False
-        delegate.response_data = bytearray()
-        delegate.current_uuid = request_id
+        delegate.expect_response(id_header)
+        
+        # Slice the payload through a memoryview so only the final chunk
+        # concatenation copies bytes
+        request_view = memoryview(request_bytes)
         
         for i in range(total_chunks):
             start = i * max_chunk_size
@@ -187,31 +276,35 @@ def send_http_request(peripheral, method, path, headers=None, body=None):
                 flags |= 2  # Last chunk
             
             # Prepare chunk with request ID and flags
-            chunk = bytearray(request_id.encode('utf-8'))
-            # Pad to 16 bytes
-            chunk.extend(b'\0' * (16 - len(chunk)))
-            chunk.append(flags)
-            chunk.extend(request_bytes[start:end])
+            chunk = id_header + bytes((flags,)) + request_view[start:end]
             
             # Send chunk
-            request_char.write(chunk, withResponse=True)
+            is_last = i == total_chunks - 1
+            request_char.write(chunk, withResponse=is_last or not can_write_no_resp)
             
-            logger.debug(f"Sent chunk {i+1}/{total_chunks}: {len(chunk)} bytes")
+            logger.debug("Sent chunk %d/%d: %d bytes", i + 1, total_chunks, len(chunk))
         
         # Wait for response
-        start_time = time.time()
         timeout = 30  # 30 seconds timeout
-        
-        while not delegate.response_complete and time.time() - start_time < timeout:
-            if peripheral.waitForNotifications(1.0):
-                continue
-        
-        if not delegate.response_complete:
+        monotonic = time.monotonic
+        deadline = monotonic() + timeout
+        is_complete = delegate.response_complete.is_set
+        wait = peripheral.waitForNotifications
+        
+        # waitForNotifications returns as soon as a notification is handled,
+        # so wait for whatever time is left instead of polling on a fixed tick
+        while not is_complete():
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            wait(remaining)
+        
+        if not is_complete():
             logger.error("Timeout waiting for response")
             return None
         
         # Parse HTTP response
-        response_data = bytes(delegate.response_data)
+        response_data = delegate.response_data
         
         # Find the end of headers
         header_end = response_data.find(b'\r\n\r\n')
@@ -219,18 +312,17 @@ def send_http_request(peripheral, method, path, headers=None, body=None):
             logger.error("Invalid HTTP response: no header separator found")
             return None
         
-        headers_data = response_data[:header_end].decode('utf-8')
         body_data = response_data[header_end + 4:]
         
-        headers_lines = headers_data.split('\r\n')
-        status_line = headers_lines[0]
-        headers = {}
+        # Only the header block is decoded, as ISO-8859-1 per RFC 7230, so
+        # every header byte survives; the body stays raw bytes
+        status_line, *header_lines = response_data[:header_end].decode('iso-8859-1').split('\r\n')
         
-        for line in headers_lines[1:]:
-            if not line:
-                continue
-            key, value = line.split(':', 1)
-            headers[key.strip()] = value.strip()
+        headers = {}
+        for line in header_lines:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip()] = value.strip()
         
         response = {
             'status_line': status_line,
@@ -255,7 +347,85 @@ def send_http_request(peripheral, method, path, headers=None, body=None):
         traceback.print_exc()
         return None
 
+class BleSession:
+    """Keeps one connection to a device warm across several operations"""
+    def __init__(self, address, idle_ttl=DEFAULT_IDLE_TTL):
+        self.address = address
+        self.idle_ttl = idle_ttl
+        self.peripheral = None
+        self.last_used = 0
+    
+    def __enter__(self):
+        self.connect()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def connect(self):
+        """Connect if needed, dropping a connection that has been idle too long"""
+        if self.peripheral and time.monotonic() - self.last_used > self.idle_ttl:
+            logger.info(f"Connection idle for more than {self.idle_ttl}s, reconnecting")
+            self.close()
+        
+        if not self.peripheral:
+            self.peripheral = connect_to_device(self.address)
+        
+        self.last_used = time.monotonic()
+        return self.peripheral is not None
+    
+    def close(self):
+        if self.peripheral:
+            try:
+                self.peripheral.disconnect()
+            except btle.BTLEException as e:
+                logger.warning(f"Error while disconnecting: {e}")
+            self.peripheral = None
+    
+    def _run(self, operation, *args):
+        """Run an operation on the connection, reconnecting once if it fails
+        
+        A failed operation may mean the link dropped, so the peripheral is
+        closed rather than reused for the next operation.
+        """
+        for attempt in range(2):
+            if not self.connect():
+                return None
+            try:
+                result = operation(self.peripheral, *args)
+            except btle.BTLEException as e:
+                logger.error(f"BLE operation failed: {e}")
+                result = None
+            self.last_used = time.monotonic()
+            
+            if result is not None:
+                return result
+            self.close()
+            if attempt == 0:
+                logger.info("Reconnecting and retrying once")
+        return None
+    
+    def get_status(self):
+        return self._run(get_status)
+    
+    def send_request(self, method, path, headers=None, body=None):
+        return self._run(send_http_request, method, path, headers, body)
+
+def print_response_body(response):
+    """Print the start of a response body"""
+    if response and 'body' in response:
+        try:
+            body_text = response['body'].decode('utf-8')
+            print("\nResponse body:")
+            print(body_text[:1000])  # Print first 1000 chars
+            if len(body_text) > 1000:
+                print("... (truncated)")
+        except:
+            print("\nResponse body: (binary data)")
+
 def main():
+    import argparse
+    
     parser = argparse.ArgumentParser(description='NetTool BLE HTTP Proxy Client')
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('--scan', action='store_true', help='Scan for BLE devices')
@@ -263,8 +433,13 @@ def main():
     group.add_argument('--status', type=str, help='Get status from a specific device')
     group.add_argument('--get', type=str, help='Send GET request to a specific device')
     
-    parser.add_argument('--path', type=str, default='/', help='HTTP path for request (default: /)')
+    parser.add_argument('--path', type=str, action='append',
+                        help='HTTP path for request (default: /); repeat to send several requests')
+    parser.add_argument('--stdin', action='store_true',
+                        help='Read additional paths from stdin, one per line, over the same connection')
     parser.add_argument('--timeout', type=int, default=10, help='Timeout in seconds (default: 10)')
+    parser.add_argument('--idle-ttl', type=int, default=DEFAULT_IDLE_TTL,
+                        help=f'Seconds an idle connection is kept before reconnecting (default: {DEFAULT_IDLE_TTL})')
     
     args = parser.parse_args()
     
@@ -280,29 +455,30 @@ def main():
         return
     
     if args.status:
-        peripheral = connect_to_device(args.status)
-        if peripheral:
-            get_status(peripheral)
-            peripheral.disconnect()
+        with BleSession(args.status, args.idle_ttl) as session:
+            session.get_status()
         return
     
     if args.get:
-        peripheral = connect_to_device(args.get)
-        if peripheral:
-            response = send_http_request(peripheral, 'GET', args.path)
-            if response and 'body' in response:
-                try:
-                    body_text = response['body'].decode('utf-8')
-                    print("\nResponse body:")
-                    print(body_text[:1000])  # Print first 1000 chars
-                    if len(body_text) > 1000:
-                        print("... (truncated)")
-                except:
-                    print("\nResponse body: (binary data)")
-            peripheral.disconnect()
+        paths = args.path or ['/']
+        with BleSession(args.get, args.idle_ttl) as session:
+            for path in paths:
+                print_response_body(session.send_request('GET', path))
+            
+            if args.stdin:
+                for line in sys.stdin:
+                    path = line.strip()
+                    if path:
+                        print_response_body(session.send_request('GET', path))
         return
 
 if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
     try:
         main()
     except KeyboardInterrupt:
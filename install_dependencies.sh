@@ -77,7 +77,7 @@ fi
 
 # Set capabilities for Python to allow non-root BLE scanning
 echo -e "${BLUE}Setting capabilities for Python...${NC}"
-PYTHON_PATH=$(which python3)
+PYTHON_PATH=$(command -v python3)
 setcap 'cap_net_raw,cap_net_admin+eip' "$PYTHON_PATH"
 echo -e "${GREEN}Set capabilities for $PYTHON_PATH${NC}"
 
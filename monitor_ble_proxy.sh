@@ -49,8 +49,10 @@ check_advertisement_status() {
     echo -e "${BLUE}Scanning for BLE advertisements (3 seconds)...${NC}"
     DEVICE_NAME=${1:-"NetTool"}
     
-    # Use a timeout to limit the scan time
-    SCAN_OUTPUT=$(timeout 3 hcitool lescan 2>/dev/null | grep "$DEVICE_NAME" || true)
+    # Use a timeout to limit the scan time, but stop at the first matching
+    # advertisement instead of always waiting for the full timeout.
+    # --duplicates keeps lescan writing, so it gets SIGPIPE soon after grep exits.
+    SCAN_OUTPUT=$(timeout 3 hcitool lescan --duplicates 2>/dev/null | grep -m 1 "$DEVICE_NAME" || true)
     
     if [ -n "$SCAN_OUTPUT" ]; then
         echo -e "${GREEN}BLE advertisement found: $SCAN_OUTPUT${NC}"
@@ -142,20 +144,35 @@ stop_service() {
 continuous_monitoring() {
     echo -e "${BLUE}Starting continuous monitoring (CTRL+C to exit)...${NC}"
     
+    ADV_OUTPUT=$(mktemp)
+    trap 'rm -f "$ADV_OUTPUT"' EXIT
+    
     while true; do
         clear
         echo -e "${BLUE}=== BLE HTTP Proxy Status ($(date)) ===${NC}"
         echo ""
-        check_service_status
-        check_bluez_status
         
-        if [ "$EUID" -eq 0 ]; then
+        check_service_status || true
+        
+        # The advertisement scan takes a few seconds, so run it in the
+        # background while the other checks run and print its output in order.
+        # It can't find anything while the Bluetooth service is down, so skip it then.
+        ADV_PID=""
+        if check_bluez_status && [ "$EUID" -eq 0 ]; then
+            check_advertisement_status "$1" > "$ADV_OUTPUT" 2>&1 &
+            ADV_PID=$!
+        fi
+        
+        METRICS_OUTPUT=$(check_connection_metrics)
+        
+        if [ -n "$ADV_PID" ]; then
+            wait "$ADV_PID" || true
             echo ""
-            check_advertisement_status "$1"
+            cat "$ADV_OUTPUT"
         fi
         
         echo ""
-        check_connection_metrics
+        echo "$METRICS_OUTPUT"
         
         echo ""
         echo -e "${YELLOW}Press CTRL+C to exit${NC}"
@@ -187,10 +204,10 @@ if [ "$1" == "--restart" ]; then
 fi
 
 if [ "$1" == "--status" ]; then
-    check_service_status
-    check_bluez_status
+    check_service_status || true
     
-    if [ "$EUID" -eq 0 ]; then
+    # Scanning for the advertisement is pointless without the Bluetooth service
+    if check_bluez_status && [ "$EUID" -eq 0 ]; then
         check_advertisement_status "$2"
     fi
     
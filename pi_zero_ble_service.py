@@ -5,8 +5,8 @@ This script implements a Bluetooth Low Energy GATT server that proxies HTTP requ
 to the local NetTool HTTP server and returns the responses over BLE.
 """
 
-import argparse
-import asyncio
+import collections
+import concurrent.futures
 import dbus
 import dbus.exceptions
 import dbus.mainloop.glib
@@ -16,22 +16,11 @@ import logging
 import os
 import signal
 import socket
-import struct
 import sys
 import time
 import threading
-import uuid
 from gi.repository import GLib
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("/tmp/nettool_ble_proxy.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger('nettool-ble-proxy')
 
 # BLE Service UUIDs
@@ -54,6 +43,46 @@ LE_ADVERTISEMENT_INTERFACE = 'org.bluez.LEAdvertisement1'
 
 # Status file for storing the BLE proxy state
 STATUS_FILE = '/tmp/nettool_ble_proxy.status'
+status_fd = None
+
+# Response framing: ATT notification header, then a 16-byte request ID and a
+# flags byte in front of every chunk. Attribute values are capped at 512 bytes.
+ATT_HEADER_SIZE = 3
+CHUNK_HEADER_SIZE = 17
+MAX_ATTRIBUTE_SIZE = 512
+
+# Number of idle keep-alive connections kept open to the local HTTP server
+HTTP_POOL_SIZE = 8
+
+# Status characteristic value; only the numbers change between reads
+STATUS_TEMPLATE = b'{"status": "running", "uptime": %d, "http_port": %d, "requests_processed": %d}'
+
+# Number of queued notifications sent per main loop iteration, and the most
+# that may be queued before the sending worker has to wait for the link
+NOTIFY_BATCH_SIZE = 8
+NOTIFY_QUEUE_SIZE = 32
+
+# Number of finished request buffers kept for reuse, and the largest buffer
+# worth keeping (bigger ones are left to the garbage collector)
+REQUEST_POOL_SIZE = 16
+REQUEST_POOL_MAX_BUFFER = 64 * 1024
+
+def format_error_response(status, message):
+    """Build a plain-text HTTP error response"""
+    body = message.encode('utf-8')
+    return f'HTTP/1.1 {status} {message}\r\nContent-Type: text/plain\r\nContent-Length: {len(body)}\r\n\r\n'.encode('utf-8') + body
+
+# Common error responses, encoded once
+ERROR_RESPONSES = {
+    (status, message): format_error_response(status, message)
+    for status, message in [
+        (400, 'Bad Request'),
+        (500, 'Internal Server Error'),
+        (502, 'Bad Gateway'),
+        (503, 'Service Unavailable'),
+        (504, 'Gateway Timeout'),
+    ]
+}
 
 class InvalidArgsException(dbus.exceptions.DBusException):
     _dbus_error_name = 'org.freedesktop.DBus.Error.InvalidArgs'
@@ -64,41 +93,85 @@ class NotSupportedException(dbus.exceptions.DBusException):
 class NotPermittedException(dbus.exceptions.DBusException):
     _dbus_error_name = 'org.bluez.Error.NotPermitted'
 
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection to a server listening on a UNIX domain socket"""
+    def __init__(self, socket_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+    
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+def acquire_socket(options):
+    """Create the socket pair handed to BlueZ by AcquireWrite/AcquireNotify
+    
+    BlueZ only calls those methods on characteristics that expose the
+    WriteAcquired/NotifyAcquired property. Returns our non-blocking end,
+    BlueZ's end wrapped for D-Bus, and the MTU BlueZ negotiated.
+    """
+    ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    ours.setblocking(False)
+    
+    # UnixFd duplicates the descriptor, so our copy of BlueZ's end can be closed
+    fd = dbus.types.UnixFd(theirs)
+    theirs.close()
+    
+    return ours, fd, int(options.get('mtu', 23))
+
 class HTTPRequest:
-    """Represents an HTTP request received over BLE"""
-    def __init__(self, request_id):
-        self.request_id = request_id
+    """Represents an HTTP request received over BLE
+    
+    request_id is the raw 16-byte, NUL-padded ID from the chunk header; it
+    is echoed back verbatim in every response chunk.
+    """
+    def __init__(self, request_id, mtu=None):
         self.data = bytearray()
+        self.reset(request_id, mtu)
+    
+    def reset(self, request_id, mtu=None):
+        """Prepare for a new request, keeping the existing buffer"""
+        self.request_id = request_id
+        self.mtu = mtu
+        self.length = 0
         self.complete = False
     
     def add_chunk(self, chunk, is_first, is_last):
-        self.data.extend(chunk)
+        end = self.length + len(chunk)
+        if end > len(self.data):
+            # Grow by doubling so large uploads only reallocate O(log n) times
+            self.data.extend(bytes(max(end, 2 * len(self.data)) - len(self.data)))
+        self.data[self.length:end] = chunk
+        self.length = end
         if is_last:
             self.complete = True
     
     def parse(self):
         """Parse the HTTP request into method, path, headers, and body"""
         try:
-            request_str = self.data.decode('utf-8')
-            lines = request_str.split('\r\n')
+            # Split at the blank line without decoding the body, which may
+            # be binary; header bytes are ISO-8859-1 per RFC 7230
+            header_end = self.data.find(b'\r\n\r\n', 0, self.length)
+            if header_end < 0:
+                header_end = body_start = self.length
+            else:
+                body_start = header_end + 4
+            with memoryview(self.data) as view:
+                head = view[:header_end].tobytes().decode('iso-8859-1')
+                body = view[body_start:self.length].tobytes()
+            lines = head.split('\r\n')
             
             # Parse request line
             method, path, _ = lines[0].split(' ')
             
             # Parse headers
             headers = {}
-            body_start = 0
-            for i, line in enumerate(lines[1:], 1):
-                if not line:
-                    body_start = i + 1
-                    break
+            for line in lines[1:]:
                 if ':' in line:
                     key, value = line.split(':', 1)
                     headers[key.strip()] = value.strip()
             
-            # Get body if present
-            body = '\r\n'.join(lines[body_start:]) if body_start < len(lines) else ''
-            
             return {
                 'method': method,
                 'path': path,
@@ -106,13 +179,14 @@ class HTTPRequest:
                 'body': body
             }
         except Exception as e:
-            logger.error(f"Error parsing HTTP request: {e}")
+            logger.error("Error parsing HTTP request: %s", e)
             return None
 
 class Advertisement(dbus.service.Object):
     """BLE Advertisement object for the HTTP Proxy service"""
     def __init__(self, bus, index, advertising_type, device_name):
         self.path = f"/org/bluez/example/advertisement{index}"
+        self.object_path = dbus.ObjectPath(self.path)
         self.bus = bus
         self.ad_type = advertising_type
         self.device_name = device_name
@@ -122,6 +196,10 @@ class Advertisement(dbus.service.Object):
         self.service_data = {}
         self.include_tx_power = True
         dbus.service.Object.__init__(self, bus, self.path)
+        
+        # Properties don't change after construction, so build the D-Bus
+        # wrappers once instead of on every GetAll
+        self._properties = self.get_properties()
 
     def get_properties(self):
         properties = dict()
@@ -142,7 +220,7 @@ class Advertisement(dbus.service.Object):
         return {LE_ADVERTISEMENT_INTERFACE: properties}
 
     def get_path(self):
-        return dbus.ObjectPath(self.path)
+        return self.object_path
 
     @dbus.service.method(DBUS_PROP_INTERFACE,
                          in_signature='s',
@@ -150,7 +228,7 @@ class Advertisement(dbus.service.Object):
     def GetAll(self, interface):
         if interface != LE_ADVERTISEMENT_INTERFACE:
             raise InvalidArgsException()
-        return self.get_properties()[LE_ADVERTISEMENT_INTERFACE]
+        return self._properties[LE_ADVERTISEMENT_INTERFACE]
 
     @dbus.service.method(LE_ADVERTISEMENT_INTERFACE,
                          in_signature='',
@@ -160,15 +238,26 @@ class Advertisement(dbus.service.Object):
 
 class HTTPProxyService(dbus.service.Object):
     """GATT Service for HTTP Proxying"""
-    def __init__(self, bus, index, http_port):
+    def __init__(self, bus, index, http_port, unix_socket=None):
         self.path = f"/org/bluez/example/service{index}"
+        self.object_path = dbus.ObjectPath(self.path)
         self.bus = bus
         self.http_port = http_port
+        self.unix_socket = unix_socket
         self.pending_requests = {}
         self.next_response_handle = 1
+        self._http_pool = []
+        self._http_pool_lock = threading.Lock()
+        self._request_pool = []
+        self._request_pool_lock = threading.Lock()
+        # One worker per pooled connection; further requests wait in the queue
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=HTTP_POOL_SIZE, thread_name_prefix='ble-http')
         
         dbus.service.Object.__init__(self, bus, self.path)
         
+        self._properties = self.get_properties()
+        
         self.add_request_characteristic()
         self.add_response_characteristic()
         self.add_status_characteristic()
@@ -182,7 +271,7 @@ class HTTPProxyService(dbus.service.Object):
         }
     
     def get_path(self):
-        return dbus.ObjectPath(self.path)
+        return self.object_path
     
     @dbus.service.method(DBUS_PROP_INTERFACE,
                         in_signature='s',
@@ -190,7 +279,7 @@ class HTTPProxyService(dbus.service.Object):
     def GetAll(self, interface):
         if interface != GATT_SERVICE_INTERFACE:
             raise InvalidArgsException()
-        return self.get_properties()[GATT_SERVICE_INTERFACE]
+        return self._properties[GATT_SERVICE_INTERFACE]
     
     def add_request_characteristic(self):
         self.request_characteristic = HTTPRequestCharacteristic(self.bus, 0, self)
@@ -201,103 +290,210 @@ class HTTPProxyService(dbus.service.Object):
     def add_status_characteristic(self):
         self.status_characteristic = StatusCharacteristic(self.bus, 2, self)
     
+    def submit_request(self, request):
+        """Queue a complete request for processing on the worker pool"""
+        future = self._executor.submit(self.process_http_request, request)
+        future.add_done_callback(self._log_request_failure)
+    
+    @staticmethod
+    def _log_request_failure(future):
+        error = future.exception()
+        if error is not None:
+            logger.error("Unhandled error processing HTTP request: %s", error)
+    
+    def acquire_request(self, request_id, mtu=None):
+        """Get a request object, reusing a pooled one when available"""
+        with self._request_pool_lock:
+            request = self._request_pool.pop() if self._request_pool else None
+        if request is None:
+            return HTTPRequest(request_id, mtu)
+        request.reset(request_id, mtu)
+        return request
+    
+    def release_request(self, request):
+        """Return a finished request object to the pool"""
+        if len(request.data) > REQUEST_POOL_MAX_BUFFER:
+            return
+        with self._request_pool_lock:
+            if len(self._request_pool) < REQUEST_POOL_SIZE:
+                self._request_pool.append(request)
+    
+    def _get_http_connection(self):
+        """Take an idle keep-alive connection from the pool or open a new one"""
+        with self._http_pool_lock:
+            if self._http_pool:
+                return self._http_pool.pop(), True
+        return self._new_http_connection(), False
+    
+    def _new_http_connection(self):
+        if self.unix_socket:
+            return UnixHTTPConnection(self.unix_socket, timeout=10)
+        return http.client.HTTPConnection('localhost', self.http_port, timeout=10)
+    
+    def _release_http_connection(self, conn, response):
+        """Return a connection to the pool if the server kept it open"""
+        if not response.will_close:
+            with self._http_pool_lock:
+                if len(self._http_pool) < HTTP_POOL_SIZE:
+                    self._http_pool.append(conn)
+                    return
+        conn.close()
+    
+    def _forward_http_request(self, method, path, body, headers):
+        """Send a request to the local HTTP server over a pooled connection
+        
+        Returns the connection and the response with its body still unread;
+        release the connection once the body has been consumed.
+        """
+        conn, reused = self._get_http_connection()
+        try:
+            try:
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+            except ConnectionError:
+                # The server may have dropped an idle keep-alive connection;
+                # retry once on a fresh one before giving up
+                conn.close()
+                if not reused:
+                    raise
+                conn = self._new_http_connection()
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+        
+        return conn, response
+    
     def process_http_request(self, request):
         """Process an HTTP request and send the response"""
         parsed = request.parse()
+        request_id, mtu = request.request_id, request.mtu
+        # parse() copies everything out of the buffer, so it can be reused now
+        self.release_request(request)
         if not parsed:
-            self.send_error_response(request.request_id, 400, "Bad Request")
+            self.send_error_response(request_id, 400, "Bad Request", mtu)
             return
         
         try:
-            # Connect to the local HTTP server
-            conn = http.client.HTTPConnection('localhost', self.http_port, timeout=10)
-            
             # Prepare headers
             headers = parsed['headers']
             if 'Host' not in headers:
                 headers['Host'] = f'localhost:{self.http_port}'
             
-            # Send the request
-            conn.request(parsed['method'], parsed['path'], parsed['body'], headers)
-            
-            # Get the response
-            response = conn.getresponse()
-            
-            # Read the response data
-            response_data = response.read()
-            
-            # Build response string
-            status_line = f'HTTP/1.1 {response.status} {response.reason}'
-            headers_list = [f'{k}: {v}' for k, v in response.headers.items()]
-            headers_str = '\r\n'.join(headers_list)
-            
-            full_response = f'{status_line}\r\n{headers_str}\r\n\r\n'.encode('utf-8') + response_data
+            # Forward the request to the local HTTP server
+            conn, response = self._forward_http_request(
+                parsed['method'], parsed['path'], parsed['body'], headers)
             
-            # Send the response in chunks
-            self.send_response(request.request_id, full_response)
+            # Build the head with a single join; http.client decoded the
+            # status line and headers as ISO-8859-1, so encode them back that way
+            parts = [f'HTTP/1.1 {response.status} {response.reason}\r\n'.encode('iso-8859-1')]
+            parts.extend(f'{k}: {v}\r\n'.encode('iso-8859-1') for k, v in response.headers.items())
+            parts.append(b'\r\n')
             
-            conn.close()
+            # Send the head, then stream the body in chunks as it arrives
+            try:
+                sent = self.send_response(request_id, b''.join(parts), mtu, body=response)
+            except Exception:
+                conn.close()
+                raise
+            if sent:
+                self._release_http_connection(conn, response)
+            else:
+                # The body was left partly unread, so the connection can't be reused
+                conn.close()
         except Exception as e:
-            logger.error(f"Error processing HTTP request: {e}")
-            self.send_error_response(request.request_id, 500, f"Internal Server Error: {str(e)}")
+            logger.error("Error processing HTTP request: %s", e)
+            self.send_error_response(request_id, 500, f"Internal Server Error: {str(e)}", mtu)
     
-    def send_error_response(self, request_id, status, message):
+    def send_error_response(self, request_id, status, message, mtu=None):
         """Send an error response for a request"""
-        response = f'HTTP/1.1 {status} {message}\r\nContent-Type: text/plain\r\nContent-Length: {len(message)}\r\n\r\n{message}'.encode('utf-8')
-        self.send_response(request_id, response)
+        response = ERROR_RESPONSES.get((status, message)) or format_error_response(status, message)
+        self.send_response(request_id, response, mtu)
     
-    def send_response(self, request_id, response_data):
-        """Send a response in chunks"""
+    def send_response(self, request_id, response_data, mtu=None, body=None):
+        """Send a response in chunks sized to the link's ATT MTU
+        
+        If body (a file-like object) is given, it is read after response_data
+        and sent as it arrives. Together with the bounded notification queue
+        this caps memory at NOTIFY_QUEUE_SIZE frames however large the body.
+        Returns False if notifications stopped before the last chunk, in
+        which case the rest of the body is not read.
+        """
         # Maximum data size per notification
-        max_chunk_size = 512 - 17  # 16 bytes for request ID, 1 byte for flags
+        mtu = mtu or self.response_characteristic.mtu
+        if mtu:
+            value_size = min(mtu - ATT_HEADER_SIZE, MAX_ATTRIBUTE_SIZE)
+        else:
+            # MTU unknown (older BlueZ): use the largest attribute value
+            value_size = MAX_ATTRIBUTE_SIZE
+        max_chunk_size = value_size - CHUNK_HEADER_SIZE
         
-        # Calculate number of chunks
-        total_chunks = (len(response_data) + max_chunk_size - 1) // max_chunk_size
+        # One frame buffer for the whole response: the padded request ID is
+        # written once and only the flags and payload change per chunk
+        frame = bytearray(CHUNK_HEADER_SIZE + max_chunk_size)
+        frame[:16] = request_id
         
-        for i in range(total_chunks):
-            start = i * max_chunk_size
-            end = min(start + max_chunk_size, len(response_data))
+        pending = bytearray(response_data)
+        flags = 1  # First chunk
+        while True:
+            # Keep more than a chunk buffered so the last one can be flagged
+            while body is not None and len(pending) <= max_chunk_size:
+                data = body.read(max_chunk_size)
+                if data:
+                    pending += data
+                else:
+                    body = None
             
-            # Create flags: bit 0 = first chunk, bit 1 = last chunk
-            flags = 0
-            if i == 0:
-                flags |= 1  # First chunk
-            if i == total_chunks - 1:
+            size = min(len(pending), max_chunk_size)
+            if body is None and len(pending) <= max_chunk_size:
                 flags |= 2  # Last chunk
             
-            # Prepare chunk with request ID and flags
-            chunk = bytearray(request_id.encode('utf-8')[:16])
-            # Pad to 16 bytes if needed
-            chunk.extend(b'\0' * (16 - len(chunk)))
-            chunk.append(flags)
-            chunk.extend(response_data[start:end])
+            frame[16] = flags
+            with memoryview(pending) as view:
+                frame[17:17 + size] = view[:size]
+            if flags & 2:
+                # Final chunk may be short
+                del frame[17 + size:]
             
-            # Send notification
-            self.response_characteristic.send_notification(chunk)
+            # Queue notification; blocks while the link is behind
+            if not self.response_characteristic.send_notification(frame):
+                return False
             
-            # Small delay to avoid overwhelming the client
-            time.sleep(0.01)
+            if flags & 2:
+                return True
+            del pending[:size]
+            flags = 0
 
 class HTTPRequestCharacteristic(dbus.service.Object):
     """GATT Characteristic for receiving HTTP requests"""
     def __init__(self, bus, index, service):
         self.path = service.path + '/char' + str(index)
+        self.object_path = dbus.ObjectPath(self.path)
         self.bus = bus
         self.service = service
+        self._write_sock = None
+        self._write_watch = None
+        self._write_mtu = None
+        self._write_buffer = None
         
         dbus.service.Object.__init__(self, bus, self.path)
+        
+        # Only WriteAcquired changes, and it is updated in place
+        self._properties = self.get_properties()
     
     def get_properties(self):
         return {
             GATT_CHARACTERISTIC_INTERFACE: {
                 'UUID': BLE_HTTP_REQUEST_CHAR_UUID,
                 'Service': self.service.get_path(),
-                'Flags': ['write'],
+                'Flags': ['write', 'write-without-response'],
+                'WriteAcquired': dbus.Boolean(self._write_sock is not None),
             }
         }
     
     def get_path(self):
-        return dbus.ObjectPath(self.path)
+        return self.object_path
     
     @dbus.service.method(DBUS_PROP_INTERFACE,
                         in_signature='s',
@@ -305,7 +501,7 @@ class HTTPRequestCharacteristic(dbus.service.Object):
     def GetAll(self, interface):
         if interface != GATT_CHARACTERISTIC_INTERFACE:
             raise InvalidArgsException()
-        return self.get_properties()[GATT_CHARACTERISTIC_INTERFACE]
+        return self._properties[GATT_CHARACTERISTIC_INTERFACE]
     
     @dbus.service.method(GATT_CHARACTERISTIC_INTERFACE,
                         in_signature='a{sv}',
@@ -316,17 +512,82 @@ class HTTPRequestCharacteristic(dbus.service.Object):
     
     @dbus.service.method(GATT_CHARACTERISTIC_INTERFACE,
                         in_signature='aya{sv}',
-                        out_signature='')
+                        out_signature='',
+                        byte_arrays=True)
     def WriteValue(self, value, options):
-        # Convert dbus.Array to bytes
-        received = bytes(value)
+        # Chunks written without response may still be waiting in the
+        # acquired socket; they were sent before this one
+        self._read_acquired_writes()
+        
+        # BlueZ passes the negotiated MTU with each write
+        mtu = int(options['mtu']) if 'mtu' in options else None
+        
+        # byte_arrays=True delivers the value as bytes rather than an array
+        # of dbus.Byte; slice it through a view to avoid further copies
+        self.handle_chunk(memoryview(value), mtu)
+    
+    @dbus.service.method(GATT_CHARACTERISTIC_INTERFACE,
+                        in_signature='a{sv}',
+                        out_signature='hq')
+    def AcquireWrite(self, options):
+        """Hand BlueZ a socket to deliver writes without response through
+        
+        Each packet on the socket is one written value, so those chunks skip
+        D-Bus unmarshalling entirely. Writes with response still arrive
+        through WriteValue.
+        """
+        if self._write_sock is not None:
+            raise NotPermittedException()
+        
+        self._write_sock, fd, self._write_mtu = acquire_socket(options)
+        self._write_buffer = bytearray(self._write_mtu)
+        self._properties[GATT_CHARACTERISTIC_INTERFACE]['WriteAcquired'] = dbus.Boolean(True)
+        self._write_watch = GLib.io_add_watch(
+            self._write_sock.fileno(), GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+            self._on_write_ready)
         
+        logger.info(f"HTTP Request writes acquired (MTU {self._write_mtu})")
+        return fd, dbus.UInt16(self._write_mtu)
+    
+    def _on_write_ready(self, fd, condition):
+        self._read_acquired_writes()
+        return self._write_sock is not None
+    
+    def _read_acquired_writes(self):
+        """Handle every chunk currently queued on the acquired socket"""
+        while self._write_sock is not None:
+            try:
+                size = self._write_sock.recv_into(self._write_buffer)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                logger.error("Error reading acquired write: %s", e)
+                size = 0
+            
+            if not size:
+                # BlueZ closed its end: the client disconnected
+                self._release_write()
+                return
+            
+            self.handle_chunk(memoryview(self._write_buffer)[:size], self._write_mtu)
+    
+    def _release_write(self):
+        GLib.source_remove(self._write_watch)
+        self._write_watch = None
+        self._write_sock.close()
+        self._write_sock = None
+        self._properties[GATT_CHARACTERISTIC_INTERFACE]['WriteAcquired'] = dbus.Boolean(False)
+        logger.info("HTTP Request writes released")
+    
+    def handle_chunk(self, received, mtu=None):
+        """Add one framed chunk to its request, dispatching it when complete"""
         if len(received) < 17:  # At least request ID (16 bytes) + flags (1 byte)
             logger.error("Received data too short")
             return
         
-        # Extract request ID and flags
-        request_id = received[:16].decode('utf-8').rstrip('\0')
+        # Extract request ID and flags; the padded ID bytes are used as-is
+        # for the lookup key and the response header, so nothing is decoded
+        request_id = received[:16].tobytes()
         flags = received[16]
         data = received[17:]
         
@@ -335,11 +596,11 @@ class HTTPRequestCharacteristic(dbus.service.Object):
         
         # Get or create request object
         if is_first:
-            self.service.pending_requests[request_id] = HTTPRequest(request_id)
+            self.service.pending_requests[request_id] = self.service.acquire_request(request_id, mtu)
         
         request = self.service.pending_requests.get(request_id)
         if not request:
-            logger.error(f"Received chunk for unknown request ID: {request_id}")
+            logger.error("Received chunk for unknown request ID: %r", request_id.rstrip(b'\0'))
             return
         
         # Add data to request
@@ -347,11 +608,8 @@ class HTTPRequestCharacteristic(dbus.service.Object):
         
         # If request is complete, process it
         if is_last:
-            # Process in a separate thread to avoid blocking
-            threading.Thread(
-                target=self.service.process_http_request,
-                args=(request,)
-            ).start()
+            # Process on a worker thread to avoid blocking
+            self.service.submit_request(request)
             
             # Remove from pending requests
             del self.service.pending_requests[request_id]
@@ -360,11 +618,25 @@ class HTTPResponseCharacteristic(dbus.service.Object):
     """GATT Characteristic for sending HTTP responses"""
     def __init__(self, bus, index, service):
         self.path = service.path + '/char' + str(index)
+        self.object_path = dbus.ObjectPath(self.path)
         self.bus = bus
         self.service = service
         self.notifying = False
+        self._pending_chunks = collections.deque()
+        # One credit per queue slot: taken when a chunk is queued and given
+        # back once the main loop has sent or dropped it
+        self._credits = threading.Semaphore(NOTIFY_QUEUE_SIZE)
+        self._drain_lock = threading.Lock()
+        self._drain_scheduled = False
+        self._notify_sock = None
+        self._hangup_watch = None
+        self._writable_watch = None
+        self.mtu = None
         
         dbus.service.Object.__init__(self, bus, self.path)
+        
+        # Only NotifyAcquired changes, and it is updated in place
+        self._properties = self.get_properties()
     
     def get_properties(self):
         return {
@@ -372,11 +644,12 @@ class HTTPResponseCharacteristic(dbus.service.Object):
                 'UUID': BLE_HTTP_RESPONSE_CHAR_UUID,
                 'Service': self.service.get_path(),
                 'Flags': ['notify'],
+                'NotifyAcquired': dbus.Boolean(self._notify_sock is not None),
             }
         }
     
     def get_path(self):
-        return dbus.ObjectPath(self.path)
+        return self.object_path
     
     @dbus.service.method(DBUS_PROP_INTERFACE,
                         in_signature='s',
@@ -384,7 +657,7 @@ class HTTPResponseCharacteristic(dbus.service.Object):
     def GetAll(self, interface):
         if interface != GATT_CHARACTERISTIC_INTERFACE:
             raise InvalidArgsException()
-        return self.get_properties()[GATT_CHARACTERISTIC_INTERFACE]
+        return self._properties[GATT_CHARACTERISTIC_INTERFACE]
     
     @dbus.service.method(GATT_CHARACTERISTIC_INTERFACE,
                         in_signature='a{sv}',
@@ -416,14 +689,140 @@ class HTTPResponseCharacteristic(dbus.service.Object):
         if not self.notifying:
             return
         self.notifying = False
+        self._discard_pending()
         logger.info("HTTP Response notifications disabled")
     
+    @dbus.service.method(GATT_CHARACTERISTIC_INTERFACE,
+                        in_signature='a{sv}',
+                        out_signature='hq')
+    def AcquireNotify(self, options):
+        """Hand BlueZ a socket to read notifications from
+        
+        Each packet written to the socket becomes one notification, so
+        chunks no longer have to be marshalled through PropertiesChanged.
+        """
+        if self._notify_sock is not None:
+            raise NotPermittedException()
+        
+        self._notify_sock, fd, self.mtu = acquire_socket(options)
+        self._properties[GATT_CHARACTERISTIC_INTERFACE]['NotifyAcquired'] = dbus.Boolean(True)
+        self._hangup_watch = GLib.io_add_watch(
+            self._notify_sock.fileno(), GLib.IO_HUP | GLib.IO_ERR, self._on_notify_hangup)
+        
+        self.notifying = True
+        logger.info(f"HTTP Response notifications acquired (MTU {self.mtu})")
+        return fd, dbus.UInt16(self.mtu)
+    
+    def _on_notify_hangup(self, fd, condition):
+        """BlueZ closed its end: the client disabled notifications"""
+        self._release_notify()
+        logger.info("HTTP Response notifications released")
+        return False
+    
+    def _release_notify(self):
+        if self._hangup_watch is not None:
+            GLib.source_remove(self._hangup_watch)
+            self._hangup_watch = None
+        if self._writable_watch is not None:
+            # The drain was parked on this watch; let the next chunk reschedule it
+            GLib.source_remove(self._writable_watch)
+            self._writable_watch = None
+            with self._drain_lock:
+                self._drain_scheduled = False
+        if self._notify_sock is not None:
+            self._notify_sock.close()
+            self._notify_sock = None
+            self._properties[GATT_CHARACTERISTIC_INTERFACE]['NotifyAcquired'] = dbus.Boolean(False)
+        self.notifying = False
+        self._discard_pending()
+    
+    def _discard_pending(self):
+        """Drop queued chunks, returning their credits to blocked senders"""
+        while True:
+            try:
+                self._pending_chunks.popleft()
+            except IndexError:
+                return
+            self._credits.release()
+    
     def send_notification(self, data):
+        """Queue a chunk for notification from the main loop
+        
+        Called from worker threads, never the main loop: once
+        NOTIFY_QUEUE_SIZE chunks are waiting, this blocks until the main
+        loop has sent one, so a worker can't outrun the link. Returns False
+        if notifications are (or become) disabled and the chunk was dropped.
+        """
         if not self.notifying:
-            return
+            return False
         
-        self.PropertiesChanged(GATT_CHARACTERISTIC_INTERFACE,
-                              {'Value': dbus.Array(data, signature='y')}, [])
+        self._credits.acquire()
+        if not self.notifying:
+            # Notifications stopped while we waited for a slot
+            self._credits.release()
+            return False
+        
+        self._pending_chunks.append(bytes(data))
+        with self._drain_lock:
+            if self._drain_scheduled:
+                return True
+            self._drain_scheduled = True
+        GLib.idle_add(self._drain)
+        return True
+    
+    def _on_writable(self, fd, condition):
+        """The acquired socket has room again: resume the idle drain"""
+        self._writable_watch = None
+        if self._drain():
+            GLib.idle_add(self._drain)
+        return False
+    
+    def _drain(self):
+        """Emit a batch of queued chunks; stays scheduled while chunks remain
+        
+        Runs as an idle callback. While the acquired socket is full it parks
+        on a one-shot writability watch instead.
+        """
+        for _ in range(NOTIFY_BATCH_SIZE):
+            try:
+                data = self._pending_chunks.popleft()
+            except IndexError:
+                with self._drain_lock:
+                    if not self._pending_chunks:
+                        self._drain_scheduled = False
+                        return False
+                continue
+            
+            if not self.notifying:
+                self._credits.release()
+                continue
+            
+            if self._notify_sock is None:
+                # ByteArray is marshalled straight from the buffer rather than
+                # as one dbus.Byte per element
+                self.PropertiesChanged(GATT_CHARACTERISTIC_INTERFACE,
+                                      {'Value': dbus.ByteArray(data)}, [])
+                self._credits.release()
+                continue
+            
+            try:
+                self._notify_sock.send(data)
+            except BlockingIOError:
+                # BlueZ has not caught up yet; the chunk keeps its credit and
+                # sending resumes once the socket is writable
+                self._pending_chunks.appendleft(data)
+                self._writable_watch = GLib.io_add_watch(
+                    self._notify_sock.fileno(), GLib.IO_OUT, self._on_writable)
+                return False
+            except OSError as e:
+                logger.error("Error sending notification: %s", e)
+                self._credits.release()
+                self._release_notify()
+                with self._drain_lock:
+                    self._drain_scheduled = False
+                return False
+            self._credits.release()
+        return True
 
     @dbus.service.signal(dbus.PROPERTIES_IFACE,
                          signature='sa{sv}as')
@@ -434,10 +833,13 @@ class StatusCharacteristic(dbus.service.Object):
     """GATT Characteristic for service status"""
     def __init__(self, bus, index, service):
         self.path = service.path + '/char' + str(index)
+        self.object_path = dbus.ObjectPath(self.path)
         self.bus = bus
         self.service = service
         
         dbus.service.Object.__init__(self, bus, self.path)
+        
+        self._properties = self.get_properties()
     
     def get_properties(self):
         return {
@@ -449,7 +851,7 @@ class StatusCharacteristic(dbus.service.Object):
         }
     
     def get_path(self):
-        return dbus.ObjectPath(self.path)
+        return self.object_path
     
     @dbus.service.method(DBUS_PROP_INTERFACE,
                         in_signature='s',
@@ -457,24 +859,18 @@ class StatusCharacteristic(dbus.service.Object):
     def GetAll(self, interface):
         if interface != GATT_CHARACTERISTIC_INTERFACE:
             raise InvalidArgsException()
-        return self.get_properties()[GATT_CHARACTERISTIC_INTERFACE]
+        return self._properties[GATT_CHARACTERISTIC_INTERFACE]
     
     @dbus.service.method(GATT_CHARACTERISTIC_INTERFACE,
                         in_signature='a{sv}',
                         out_signature='ay')
     def ReadValue(self, options):
-        # Return basic status information
-        status = {
-            'status': 'running',
-            'uptime': int(time.time() - start_time),
-            'http_port': self.service.http_port,
-            'requests_processed': len(self.service.pending_requests)
-        }
-        
-        # Convert to JSON and then to bytes
-        import json
-        status_json = json.dumps(status)
-        return [ord(c) for c in status_json]
+        # Return basic status information; a byte string is marshalled as
+        # 'ay' in one copy instead of one Python int per character
+        return dbus.ByteArray(STATUS_TEMPLATE % (
+            int(time.time() - start_time),
+            self.service.http_port,
+            len(self.service.pending_requests)))
     
     @dbus.service.method(GATT_CHARACTERISTIC_INTERFACE,
                         in_signature='aya{sv}',
@@ -495,12 +891,8 @@ def find_adapter(bus):
     
     return None
 
-def setup_advertisement(bus, device_name):
+def setup_advertisement(bus, adapter_path, device_name):
     """Set up BLE advertisement"""
-    adapter_path = find_adapter(bus)
-    if not adapter_path:
-        raise Exception("Bluetooth adapter not found")
-    
     adapter = dbus.Interface(bus.get_object(BLUEZ_SERVICE_NAME, adapter_path),
                            LE_ADVERTISING_MANAGER_INTERFACE)
     
@@ -512,16 +904,12 @@ def setup_advertisement(bus, device_name):
     
     return advertisement
 
-def setup_gatt_server(bus, http_port):
+def setup_gatt_server(bus, adapter_path, http_port, unix_socket=None):
     """Set up BLE GATT server"""
-    adapter_path = find_adapter(bus)
-    if not adapter_path:
-        raise Exception("Bluetooth adapter not found")
-    
     adapter = dbus.Interface(bus.get_object(BLUEZ_SERVICE_NAME, adapter_path),
                            GATT_MANAGER_INTERFACE)
     
-    service = HTTPProxyService(bus, 0, http_port)
+    service = HTTPProxyService(bus, 0, http_port, unix_socket)
     
     adapter.RegisterService(service.get_path(), {},
                           reply_handler=lambda: logger.info("Service registered"),
@@ -531,10 +919,14 @@ def setup_gatt_server(bus, http_port):
 
 def update_status_file(status):
     """Update the status file with current status"""
-    with open(STATUS_FILE, 'w') as f:
-        f.write(f"{status}\n")
-        f.write(f"PID: {os.getpid()}\n")
-        f.write(f"Started: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    global status_fd
+    if status_fd is None:
+        # Kept open so every update is a single write in place
+        status_fd = os.open(STATUS_FILE, os.O_WRONLY | os.O_CREAT, 0o644)
+    
+    payload = f"{status}\nPID: {os.getpid()}\nStarted: {started_at}\n".encode('utf-8')
+    os.pwrite(status_fd, payload, 0)
+    os.ftruncate(status_fd, len(payload))
 
 def signal_handler(sig, frame):
     """Handle termination signals"""
@@ -544,20 +936,36 @@ def signal_handler(sig, frame):
     sys.exit(0)
 
 if __name__ == '__main__':
+    # Only needed when run as a script, so importing the module stays cheap
+    import argparse
+    
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("/tmp/nettool_ble_proxy.log"),
+            logging.StreamHandler()
+        ]
+    )
+    
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='BLE HTTP Proxy for NetTool')
     parser.add_argument('--device-name', default='NetTool',
                       help='Bluetooth device name to advertise (default: NetTool)')
     parser.add_argument('--port', type=int, default=8080,
                       help='HTTP port to proxy (default: 8080)')
+    parser.add_argument('--unix-socket',
+                      help='Reach the HTTP server through this UNIX socket instead of TCP')
     args = parser.parse_args()
     
     # Set up signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    # Record start time
+    # Record start time, formatted once for every status file update
     start_time = time.time()
+    started_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))
     
     # Update status file
     update_status_file("running")
@@ -567,9 +975,14 @@ if __name__ == '__main__':
         dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
         bus = dbus.SystemBus()
         
+        # Look up the adapter once; GetManagedObjects is slow on BlueZ
+        adapter_path = find_adapter(bus)
+        if not adapter_path:
+            raise Exception("Bluetooth adapter not found")
+        
         # Set up BLE advertisement and GATT server
-        advertisement = setup_advertisement(bus, args.device_name)
-        service = setup_gatt_server(bus, args.port)
+        advertisement = setup_advertisement(bus, adapter_path, args.device_name)
+        service = setup_gatt_server(bus, adapter_path, args.port, args.unix_socket)
         
         # Start main loop
         mainloop = GLib.MainLoop()
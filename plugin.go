@@ -4,11 +4,14 @@
 package main
 
 import (
+	"context"
 	"fmt"
 	"os"
 	"os/exec"
 	"path/filepath"
+	"strconv"
 	"strings"
+	"sync"
 	"syscall"
 	"time"
 )
@@ -33,8 +36,14 @@ const (
 	// Status file for storing the BLE proxy state
 	StatusFile = "/tmp/nettool_ble_proxy.status"
 
+	// Prefix of the status file line holding the service PID
+	statusPIDPrefix = "PID:"
+
 	// Python script to run the BLE service
 	PythonScript = "pi_zero_ble_service.py"
+
+	// Upper bound for the BlueZ availability checks
+	BlueZCheckTimeout = 5 * time.Second
 )
 
 // BLE HTTP Proxy Plugin for NetTool
@@ -45,6 +54,13 @@ type BLEHTTPProxyPlugin struct {
 // Global plugin instance
 var plugin *BLEHTTPProxyPlugin
 
+// Cached result of the bluetoothctl check, valid while the binary is unchanged
+var (
+	blueZCheckMu      sync.Mutex
+	blueZCheckModTime time.Time
+	blueZInstalled    bool
+)
+
 // Plugin is the exported symbol that NetTool will look for
 var Plugin struct {
 	ID          string
@@ -137,21 +153,54 @@ func executePlugin(params map[string]interface{}) (interface{}, error) {
 
 // Check if BlueZ DBus service is available
 func isBlueZAvailable() bool {
-	// Use the bluetoothctl command to check if Bluetooth is available
-	cmd := exec.Command("bluetoothctl", "--version")
+	// Bound both checks so a hung command can't stall the plugin
+	ctx, cancel := context.WithTimeout(context.Background(), BlueZCheckTimeout)
+	defer cancel()
+
+	// The two checks are independent, so run them concurrently
+	installed := make(chan bool, 1)
+	go func() {
+		installed <- isBlueZInstalled(ctx)
+	}()
+
+	// Check if the BlueZ service is running
+	cmd := exec.CommandContext(ctx, "systemctl", "is-active", "bluetooth")
 	err := cmd.Run()
+
+	if !<-installed || err != nil {
+		return false
+	}
+
+	return true
+}
+
+// Check if bluetoothctl is installed and runs. The result is cached and only
+// re-checked when the binary's modification time changes, so repeated plugin
+// actions don't spawn a process for it every time.
+func isBlueZInstalled(ctx context.Context) bool {
+	path, err := exec.LookPath("bluetoothctl")
 	if err != nil {
 		return false
 	}
 
-	// Check if the BlueZ service is running
-	cmd = exec.Command("systemctl", "is-active", "bluetooth")
-	err = cmd.Run()
+	info, err := os.Stat(path)
 	if err != nil {
 		return false
 	}
 
-	return true
+	blueZCheckMu.Lock()
+	defer blueZCheckMu.Unlock()
+
+	if blueZInstalled && info.ModTime().Equal(blueZCheckModTime) {
+		return true
+	}
+
+	// Use the bluetoothctl command to check if Bluetooth is available
+	cmd := exec.CommandContext(ctx, path, "--version")
+	blueZInstalled = cmd.Run() == nil
+	blueZCheckModTime = info.ModTime()
+
+	return blueZInstalled
 }
 
 // Start the BLE HTTP proxy server
@@ -210,6 +259,10 @@ func startBLEProxy(deviceName string, port int) error {
 		return fmt.Errorf("failed to start BLE proxy script: %v", err)
 	}
 
+	// Reap the process when it exits, so it doesn't linger as a zombie that
+	// still answers signal 0 and looks like it is running
+	go cmd.Wait()
+
 	// Save PID to the status file in case it doesn't create one
 	pidInfo := fmt.Sprintf("running\nPID: %d\n", cmd.Process.Pid)
 	err = os.WriteFile(StatusFile, []byte(pidInfo), 0644)
@@ -235,26 +288,13 @@ func startBLEProxy(deviceName string, port int) error {
 
 // Stop the BLE HTTP proxy server
 func stopBLEProxy() error {
-	// Check if running
-	status, _ := getBLEProxyStatus()
-	if status != "running" {
-		return fmt.Errorf("BLE HTTP proxy is not running")
-	}
-
-	// Read PID from status file
-	content, err := os.ReadFile(StatusFile)
+	// Check if running, reading the PID from the same status file read
+	status, pid, err := readBLEProxyStatus()
 	if err != nil {
 		return fmt.Errorf("failed to read status file: %v", err)
 	}
-
-	// Extract PID
-	lines := strings.Split(string(content), "\n")
-	var pid int
-	for _, line := range lines {
-		if strings.HasPrefix(line, "PID:") {
-			fmt.Sscanf(line, "PID: %d", &pid)
-			break
-		}
+	if status != "running" {
+		return fmt.Errorf("BLE HTTP proxy is not running")
 	}
 
 	if pid == 0 {
@@ -273,8 +313,8 @@ func stopBLEProxy() error {
 		syscall.Kill(-pid, syscall.SIGTERM)
 	}
 
-	// Wait for service to stop
-	time.Sleep(2 * time.Second)
+	// Wait for service to stop, returning as soon as the process has exited
+	waitForProcessExit(process, 2*time.Second)
 
 	// Update status file if it wasn't updated by the script
 	status, err = getBLEProxyStatus()
@@ -285,18 +325,32 @@ func stopBLEProxy() error {
 	return nil
 }
 
+// Poll until the process no longer exists, giving up after the timeout
+func waitForProcessExit(process *os.Process, timeout time.Duration) {
+	deadline := time.Now().Add(timeout)
+	for time.Now().Before(deadline) {
+		if process.Signal(syscall.Signal(0)) != nil {
+			return
+		}
+		time.Sleep(100 * time.Millisecond)
+	}
+}
+
 // Get the current status of the BLE HTTP proxy
 func getBLEProxyStatus() (string, error) {
-	// Check if status file exists
-	_, err := os.Stat(StatusFile)
-	if os.IsNotExist(err) {
-		return "stopped", nil
-	}
+	status, _, err := readBLEProxyStatus()
+	return status, err
+}
 
-	// Read status file
+// Read the status file once and return the status along with the recorded PID
+func readBLEProxyStatus() (string, int, error) {
+	// A missing status file means the service was never started
 	content, err := os.ReadFile(StatusFile)
+	if os.IsNotExist(err) {
+		return "stopped", 0, nil
+	}
 	if err != nil {
-		return "unknown", err
+		return "unknown", 0, err
 	}
 
 	lines := strings.Split(string(content), "\n")
@@ -304,33 +358,39 @@ func getBLEProxyStatus() (string, error) {
 		status := strings.TrimSpace(lines[0])
 		if status == "running" {
 			// Verify PID is actually running
-			for _, line := range lines {
-				if strings.HasPrefix(line, "PID:") {
-					var pid int
-					fmt.Sscanf(line, "PID: %d", &pid)
-					if pid > 0 {
-						process, err := os.FindProcess(pid)
-						if err != nil || process == nil {
-							return "stopped", nil
-						}
-
-						// On Unix, FindProcess always succeeds, so we need to send a signal 0
-						// to check if the process exists
-						err = process.Signal(syscall.Signal(0))
-						if err != nil {
-							return "stopped", nil
-						}
-					}
-					break
+			pid := parseStatusPID(string(content))
+			if pid > 0 {
+				process, err := os.FindProcess(pid)
+				if err != nil || process == nil {
+					return "stopped", pid, nil
+				}
+
+				// On Unix, FindProcess always succeeds, so we need to send a signal 0
+				// to check if the process exists
+				err = process.Signal(syscall.Signal(0))
+				if err != nil {
+					return "stopped", pid, nil
 				}
 			}
-			return "running", nil
+			return "running", pid, nil
 		} else if status == "stopped" {
-			return "stopped", nil
+			return "stopped", 0, nil
+		}
+	}
+
+	return "unknown", 0, nil
+}
+
+// Extract the PID recorded in the status file, or 0 if there is none
+func parseStatusPID(content string) int {
+	for _, line := range strings.Split(content, "\n") {
+		if strings.HasPrefix(line, statusPIDPrefix) {
+			pid, _ := strconv.Atoi(strings.TrimSpace(line[len(statusPIDPrefix):]))
+			return pid
 		}
 	}
 
-	return "unknown", nil
+	return 0
 }
 
 func main() {}
@@ -43,14 +43,19 @@ echo -e "${GREEN}Bluetooth service is running.${NC}"
 
 # Check for Python dependencies
 echo -e "${YELLOW}Checking Python dependencies...${NC}"
-PYTHON_DEPS=("dbus-python" "pygobject" "bluepy")
-MISSING_DEPS=()
-
-for dep in "${PYTHON_DEPS[@]}"; do
-    if ! python3 -c "import $dep" 2>/dev/null; then
-        MISSING_DEPS+=("$dep")
-    fi
-done
+# Package name => module name. find_spec only locates each module, so a
+# single interpreter checks them all without running their import code.
+PYTHON_DEPS=("dbus-python=dbus" "pygobject=gi" "bluepy=bluepy")
+MISSING_DEPS=($(python3 - "${PYTHON_DEPS[@]}" <<'EOF'
+import importlib.util
+import sys
+
+for dep in sys.argv[1:]:
+    package, module = dep.split('=')
+    if importlib.util.find_spec(module) is None:
+        print(package)
+EOF
+))
 
 if [ ${#MISSING_DEPS[@]} -ne 0 ]; then
     echo -e "${RED}Missing Python dependencies: ${MISSING_DEPS[*]}${NC}"
@@ -110,7 +115,7 @@ echo -e "${GREEN}BLE HTTP Proxy service started with PID $BLE_SERVICE_PID${NC}"
 # Test the BLE service using the Python client
 echo -e "${YELLOW}Testing BLE service with Python client...${NC}"
 echo "Scanning for BLE devices..."
-SCAN_OUTPUT=$(python3 client/test_ble_client.py --scan --timeout 5)
+SCAN_OUTPUT=$(python3 client/test_ble_client.py --scan --timeout 5 2>&1)
 echo "$SCAN_OUTPUT"
 
 if ! echo "$SCAN_OUTPUT" | grep -q "NetTool-Test"; then
@@ -126,12 +131,16 @@ fi
 echo -e "${GREEN}BLE device 'NetTool-Test' found in scan results.${NC}"
 echo -e "${YELLOW}Sending a test HTTP request...${NC}"
 
-# Get the MAC address of the device
-MAC_ADDRESS=$(echo "$SCAN_OUTPUT" | grep "NetTool-Test" | awk '{print $1}')
+# Get the MAC address of the device: the client logs a "Device <MAC>" line
+# followed by that device's advertised name, so pick it out in one awk pass
+MAC_ADDRESS=$(echo "$SCAN_OUTPUT" | awk '
+    { for (i = 1; i < NF; i++) if ($i == "Device") mac = $(i + 1) }
+    /Local Name: NetTool-Test/ { print mac; exit }')
 echo "Connecting to device with MAC: $MAC_ADDRESS"
 
 # Send a simple GET request to the dashboard
-HTTP_RESPONSE=$(python3 client/test_ble_client.py --connect "$MAC_ADDRESS" --request "GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+# (the client builds the request line and CRLF framing itself)
+HTTP_RESPONSE=$(python3 client/test_ble_client.py --get "$MAC_ADDRESS" --path / 2>&1)
 
 # Check if we got a valid HTTP response
 if echo "$HTTP_RESPONSE" | grep -q "HTTP/1.1"; then